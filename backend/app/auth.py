@@ -1,5 +1,9 @@
+import hashlib
+import hmac
+import math
+import time
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
@@ -7,7 +11,7 @@ from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from app import models, schemas, crud
-from app.database import get_db
+from app.database import get_db, open_read_session
 from app.core.config import settings
 
 # Password Hashing
@@ -31,6 +35,24 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def _credentials_exception():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _email_from_token(token: str) -> str:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        email: str = payload.get("sub")
+        if email is None:
+            raise _credentials_exception()
+        token_data = schemas.TokenData(email=email)
+    except JWTError:
+        raise _credentials_exception()
+    return token_data.email
+
 # Auth Dependency (The most important part)
 def get_current_user(
     db: Session = Depends(get_db), 
@@ -40,21 +62,79 @@ def get_current_user(
     Dependency to get the current user from a JWT token.
     To be used in all protected endpoints.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+    email = _email_from_token(token)
+    user = crud.get_user_by_email(db, email=email)
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+# ==================
+# Read-your-writes
+# ==================
+# After a write, the client's reads stay on the primary for a few seconds.
+# The deadline travels with the client in a signed cookie, so it holds
+# whichever worker or container serves the next request.
+
+READ_STICKY_COOKIE = "read_primary_until"
+
+def _sign(value: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), value.encode(), hashlib.sha256).hexdigest()
+
+def mark_user_wrote(response: Response):
+    """
+    Pin the client's reads to the primary for a few seconds,
+    so they see their own writes even if the replica lags behind.
+    """
+    until = str(math.ceil(time.time() + settings.READ_STICKY_SECONDS))
+    response.set_cookie(
+        READ_STICKY_COOKIE,
+        f"{until}:{_sign(until)}",
+        max_age=settings.READ_STICKY_SECONDS,
+        httponly=True,
+        samesite="lax",
     )
+
+def is_sticky(cookie: Optional[str]) -> bool:
+    """
+    True if `cookie` is a valid, unexpired sticky cookie.
+    """
+    if not cookie:
+        return False
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = schemas.TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
-    
-    user = crud.get_user_by_email(db, email=token_data.email)
+        until, signature = cookie.split(":")
+        if not hmac.compare_digest(signature, _sign(until)):
+            return False
+        return int(until) > time.time()
+    except ValueError:
+        return False
+
+# Read-only session for endpoints scoped to the current user
+def get_user_read_db(request: Request):
+    """
+    Like database.get_read_db, but keeps the client on the primary
+    right after they modified something (read-your-writes).
+    """
+    db = open_read_session(prefer_primary=is_sticky(request.cookies.get(READ_STICKY_COOKIE)))
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_current_user_read(
+    db: Session = Depends(get_user_read_db),
+    token: str = Depends(oauth2_scheme)
+) -> models.User:
+    """
+    Like get_current_user, but looks the user up through the read session,
+    so read-only endpoints don't need a primary connection at all.
+    """
+    email = _email_from_token(token)
+    user = crud.get_user_by_email(db, email=email)
+    if user is None and not db.info.get("primary", True):
+        # Maybe they just registered and the replica hasn't caught up:
+        # ask the primary, and keep the rest of this request there too.
+        db.info["primary"] = True
+        user = crud.get_user_by_email(db, email=email)
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        raise _credentials_exception()
+    return user
@@ -0,0 +1,297 @@
+import hashlib
+import zlib
+from collections import OrderedDict
+
+import anyio
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+# zstd and brotli are optional: they are offered only if installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Public catalog responses are the same for everyone, so their
+# compressed bodies can be reused. User-specific routes are never cached.
+CACHEABLE_PREFIXES = ("/tracks", "/artists", "/albums")
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+# ==================
+# Compressors
+# ==================
+# All compressors share the same small interface:
+#   process(data) -> compressed bytes (may be buffered)
+#   flush()       -> push out everything buffered so far (for streaming)
+#   finish()      -> end the stream
+# The default levels are picked with benchmarks/compression_bench.py.
+
+class GzipCompressor:
+    level = 6
+
+    def __init__(self, level: int = None):
+        level = self.level if level is None else level
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+
+    def process(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class BrotliCompressor:
+    level = 4
+
+    def __init__(self, level: int = None):
+        level = self.level if level is None else level
+        self._obj = brotli.Compressor(quality=level)
+
+    def process(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class ZstdCompressor:
+    level = 3
+
+    def __init__(self, level: int = None):
+        level = self.level if level is None else level
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def process(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+# Server preference order, best first
+COMPRESSORS = {}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+COMPRESSORS["gzip"] = GzipCompressor
+
+
+def choose_encoding(accept_encoding: str):
+    """
+    Pick the best encoding we support from an Accept-Encoding header.
+    Returns None if the client accepts none of them.
+    The client's q-values decide; among equal q-values our own
+    preference order does. Codings refused with q=0 are never picked,
+    not even through "*".
+    """
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[name] = q
+
+    star = qualities.get("*", 0.0)
+    best, best_rank = None, None
+    for preference, encoding in enumerate(COMPRESSORS):
+        if encoding in qualities:
+            rank = (qualities[encoding], True, False, -preference)
+        else:
+            # Only accepted through "*": named codings win ties, and gzip
+            # is the safest pick for a client that accepts anything
+            rank = (star, False, encoding == "gzip", -preference)
+        if rank[0] > 0 and (best_rank is None or rank > best_rank):
+            best, best_rank = encoding, rank
+    return best
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    compressor = COMPRESSORS[encoding]()
+    return compressor.process(body) + compressor.finish()
+
+
+class CompressedBodyCache:
+    """
+    Small LRU of compressed bodies, keyed by encoding and a digest of
+    the uncompressed body. Hashing is much cheaper than compressing,
+    so identical catalog pages are compressed only once.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(encoding: str, body: bytes):
+        return (encoding, hashlib.blake2b(body, digest_size=16).digest())
+
+    def get(self, key):
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self._entries.move_to_end(key)
+        return compressed
+
+    def put(self, key, compressed: bytes):
+        self._entries[key] = compressed
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# ==================
+# Middleware
+# ==================
+class CompressionMiddleware:
+    """
+    Compress JSON and text responses with the best encoding the client accepts.
+    Plain responses are compressed only above `minimum_size`.
+    Streamed responses are compressed chunk by chunk as they are sent.
+    Bodies of at least `offload_min_size` bytes are compressed in a
+    worker thread instead of on the event loop.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = None,
+        offload_min_size: int = None,
+        cacheable_prefixes=CACHEABLE_PREFIXES,
+        cache_size: int = 256,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else settings.COMPRESSION_MINIMUM_SIZE
+        self.offload_min_size = (
+            offload_min_size if offload_min_size is not None else settings.COMPRESSION_OFFLOAD_MIN_SIZE
+        )
+        self.cacheable_prefixes = cacheable_prefixes
+        self.cache = CompressedBodyCache(cache_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cacheable = scope["method"] == "GET" and scope["path"].startswith(self.cacheable_prefixes)
+        responder = _CompressionResponder(self, encoding, cacheable, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, cacheable: bool, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.cacheable = cacheable
+        self._send = send
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            # Hold the headers back until we know if we'll compress
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if message["status"] != 200:
+                self.cacheable = False
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            if self.start_message is not None:
+                await self._send(self.start_message)
+                self.start_message = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None and self.start_message is not None:
+            if not more_body:
+                # Whole body in one message
+                await self._send_whole(body)
+                return
+            # First chunk of a streamed response
+            self.compressor = COMPRESSORS[self.encoding]()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            self._set_encoding_headers(headers)
+            del headers["content-length"]
+            await self._send(self.start_message)
+            self.start_message = None
+
+        if more_body:
+            chunk = self.compressor.process(body) + self.compressor.flush()
+        else:
+            chunk = self.compressor.process(body) + self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _send_whole(self, body: bytes):
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if len(body) >= self.middleware.minimum_size:
+            if self.cacheable:
+                cache = self.middleware.cache
+                key = cache.key(self.encoding, body)
+                compressed = cache.get(key)
+                if compressed is None:
+                    compressed = await self._compress(body)
+                    cache.put(key, compressed)
+                body = compressed
+            else:
+                body = await self._compress(body)
+            self._set_encoding_headers(headers)
+            headers["content-length"] = str(len(body))
+        await self._send(self.start_message)
+        self.start_message = None
+        await self._send({"type": "http.response.body", "body": body})
+
+    async def _compress(self, body: bytes) -> bytes:
+        # Typical pages compress in well under a millisecond (see
+        # benchmarks/compression_bench.py), less than a thread hop costs.
+        # Only large bodies are moved off the event loop.
+        if len(body) >= self.middleware.offload_min_size:
+            return await anyio.to_thread.run_sync(compress, self.encoding, body)
+        return compress(self.encoding, body)
+
+    def _set_encoding_headers(self, headers: MutableHeaders):
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
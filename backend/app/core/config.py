@@ -1,13 +1,37 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Optional read replica for read-only routes, falls back to DATABASE_URL
+    READ_DATABASE_URL: Optional[str] = None
+    # How long a user's reads stay on the primary after they write
+    READ_STICKY_SECONDS: int = 5
+    # How long to stop trying the replica after it failed to connect
+    READ_REPLICA_RETRY_SECONDS: int = 30
+    # How often to confirm the replica is up before sending reads to it
+    READ_REPLICA_CHECK_SECONDS: int = 5
     
     # Auth settings
     SECRET_KEY: str = "your-super-secret-key-change-this" # Change this!
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Rate limiting settings
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORE_URL: Optional[str] = None # e.g. redis://localhost:6379/0, in-process if unset
+    # Concurrent logins/registrations per process. bcrypt is CPU bound, so
+    # keep this at or below the CPUs the container actually gets.
+    RATE_LIMIT_AUTH_CONCURRENCY: int = 4
+
+    # Response compression settings
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024 # bytes, smaller bodies are sent as-is
+    COMPRESSION_OFFLOAD_MIN_SIZE: int = 256 * 1024 # bytes, larger bodies are compressed off the event loop
+
+    # How long artist and album pages are cached, in seconds
+    CATALOG_CACHE_SECONDS: int = 30
+
     class Config:
         env_file = ".env" # In case you want to use a .env file locally
 
@@ -0,0 +1,246 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ==================
+# Route Classes
+# ==================
+# Each expensive endpoint belongs to a "route class". A class has:
+#   - rate / burst: a token bucket shared by every client hitting the class
+#   - client_rate / client_burst: a token bucket per client IP
+#   - concurrency: how many requests of this class may be in flight at once
+# Anything not listed here is a cheap route and is never limited.
+
+ROUTE_CLASSES = {
+    "auth": {
+        # A bcrypt check takes ~0.3s, so `concurrency` logins can finish at
+        # most ~3 per slot per second. The shared bucket admits 2 per slot,
+        # so it kicks in before the concurrency cap does.
+        "rate": 2.0 * settings.RATE_LIMIT_AUTH_CONCURRENCY,
+        "burst": 2 * settings.RATE_LIMIT_AUTH_CONCURRENCY,
+        "client_rate": 1.0, "client_burst": 5,
+        "concurrency": settings.RATE_LIMIT_AUTH_CONCURRENCY,
+    },
+    "search": {
+        "rate": 50.0, "burst": 100,
+        "client_rate": 5.0, "client_burst": 20,
+        "concurrency": 8,
+    },
+    "admin": {
+        "rate": 0.1, "burst": 1,
+        "client_rate": 0.1, "client_burst": 1,
+        "concurrency": 1,
+    },
+}
+
+ROUTES = {
+    ("POST", "/token"): "auth",
+    ("POST", "/register"): "auth",
+    ("GET", "/tracks/search"): "search",
+    ("POST", "/seed-db"): "admin",
+}
+
+
+# ==================
+# Bucket Stores
+# ==================
+class StoreUnavailable(Exception):
+    """The shared bucket store can't be reached."""
+
+
+class InMemoryBucketStore:
+    """
+    Token buckets kept in this process.
+    Good enough for a single worker; use RedisBucketStore to share
+    the limits between several workers or containers.
+
+    A bucket that has been idle long enough to refill is the same as
+    no bucket at all, so those are dropped. `max_keys` caps memory
+    when a storm comes from many different addresses.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        # key -> (tokens, last update, time at which the bucket is full again)
+        # Ordered by last use, oldest first.
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take one token from the bucket at `key`.
+        Returns 0 if the request is allowed, otherwise the number of
+        seconds until a token becomes available.
+        """
+        now = time.monotonic()
+        tokens, last, _ = self._buckets.pop(key, (float(burst), now, now))
+        tokens = min(float(burst), tokens + (now - last) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        self._evict(now)
+        return wait
+
+    def _evict(self, now: float):
+        # Sweep idle buckets from the old end, then enforce the cap
+        while self._buckets:
+            oldest = next(iter(self._buckets))
+            if self._buckets[oldest][2] > now:
+                break
+            del self._buckets[oldest]
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+
+class RedisBucketStore:
+    """
+    Token buckets shared through Redis (or anything speaking its protocol).
+    The refill and take happen in a single Lua script so concurrent
+    workers can't both spend the last token.
+    """
+
+    SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'last')
+    local tokens = tonumber(state[1]) or burst
+    local last = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - last) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'last', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        if client is None:
+            # Imported here so redis is only needed when a shared store is configured
+            import redis.asyncio as redis
+
+            client = redis.from_url(url)
+        try:
+            from redis.exceptions import ConnectionError as RedisConnectionError
+            from redis.exceptions import TimeoutError as RedisTimeoutError
+            self._errors = (RedisConnectionError, RedisTimeoutError, OSError)
+        except ImportError:
+            self._errors = (OSError,)
+        self._client = client
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        try:
+            wait = await self._script(
+                keys=[f"ratelimit:{key}"], args=[rate, burst, time.time()]
+            )
+        except self._errors as e:
+            raise StoreUnavailable(str(e)) from e
+        return float(wait)
+
+
+def get_bucket_store():
+    if settings.RATE_LIMIT_STORE_URL:
+        return RedisBucketStore(settings.RATE_LIMIT_STORE_URL)
+    return InMemoryBucketStore()
+
+
+# ==================
+# Middleware
+# ==================
+class RateLimitMiddleware:
+    """
+    Admission control for the expensive routes.
+    Requests over the rate get a 429, requests over the concurrency
+    limit get a 503. Both answer immediately with a Retry-After header
+    instead of queueing until the client times out.
+
+    If the shared store goes down, limits fall back to per-process
+    buckets rather than failing the request.
+    """
+
+    def __init__(self, app, store=None, route_classes: Optional[dict] = None, routes: Optional[dict] = None):
+        self.app = app
+        self.store = store if store is not None else get_bucket_store()
+        self.route_classes = route_classes if route_classes is not None else ROUTE_CLASSES
+        self.routes = routes if routes is not None else ROUTES
+        self.in_flight = {name: 0 for name in self.route_classes}
+        self.fallback_store = InMemoryBucketStore()
+        self.store_down = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path != "/" and path.endswith("/"):
+            path = path.rstrip("/")
+        route_class = self.routes.get((scope["method"], path))
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limits = self.route_classes[route_class]
+
+        # Shed load first: it's a counter check and costs nothing.
+        # Check and take the slot with no await in between, so concurrent
+        # requests can't all slip past the check.
+        if self.in_flight[route_class] >= limits["concurrency"]:
+            await self._reject(503, "Server busy, try again later", 1, scope, receive, send)
+            return
+        self.in_flight[route_class] += 1
+
+        try:
+            client = scope.get("client")
+            client_host = client[0] if client else "unknown"
+            wait = await self._take(
+                f"client:{route_class}:{client_host}", limits["client_rate"], limits["client_burst"]
+            )
+            if not wait:
+                wait = await self._take(f"route:{route_class}", limits["rate"], limits["burst"])
+            if wait:
+                await self._reject(429, "Too many requests", wait, scope, receive, send)
+                return
+
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight[route_class] -= 1
+
+    async def _take(self, key: str, rate: float, burst: int) -> float:
+        try:
+            wait = await self.store.take(key, rate, burst)
+        except (StoreUnavailable, ConnectionError, TimeoutError) as e:
+            if not self.store_down:
+                logger.warning("Rate limit store unavailable, using per-process limits: %s", e)
+                self.store_down = True
+            return await self.fallback_store.take(key, rate, burst)
+        if self.store_down:
+            logger.warning("Rate limit store is back")
+            self.store_down = False
+        return wait
+
+    async def _reject(self, status_code, detail, retry_after, scope, receive, send):
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
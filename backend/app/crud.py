@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy import or_
 from app import models, schemas
 
@@ -36,6 +37,57 @@ def search_tracks(db: Session, q: str):
         )
     ).all()
 
+# ==================
+# Artist/Album CRUD
+# ==================
+# These load a page of an artist's (or album's) content in a fixed
+# number of queries, then plug the page into the relationship with
+# set_committed_value so serializing it doesn't trigger lazy loads.
+# Nested artist/album references are resolved from the session's
+# identity map, without extra queries.
+
+def get_artist_with_content(
+    db: Session,
+    artist_id: int,
+    albums_skip: int = 0,
+    albums_limit: int = 50,
+    tracks_skip: int = 0,
+    tracks_limit: int = 50,
+):
+    artist = db.query(models.Artist).filter(models.Artist.id == artist_id).first()
+    if not artist:
+        return None
+
+    albums = db.query(models.Album).filter(
+        models.Album.artist_id == artist_id
+    ).order_by(models.Album.id).offset(albums_skip).limit(albums_limit).all()
+
+    tracks = db.query(models.Track).options(
+        joinedload(models.Track.album)
+    ).filter(
+        models.Track.artist_id == artist_id
+    ).order_by(models.Track.id).offset(tracks_skip).limit(tracks_limit).all()
+
+    set_committed_value(artist, "albums", albums)
+    set_committed_value(artist, "tracks", tracks)
+    return artist
+
+def get_album_with_tracks(db: Session, album_id: int, skip: int = 0, limit: int = 50):
+    album = db.query(models.Album).options(
+        joinedload(models.Album.artist)
+    ).filter(models.Album.id == album_id).first()
+    if not album:
+        return None
+
+    tracks = db.query(models.Track).options(
+        joinedload(models.Track.artist)
+    ).filter(
+        models.Track.album_id == album_id
+    ).order_by(models.Track.id).offset(skip).limit(limit).all()
+
+    set_committed_value(album, "tracks", tracks)
+    return album
+
 # ==================
 # Playlist CRUD
 # ==================
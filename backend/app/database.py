@@ -1,10 +1,22 @@
-from sqlalchemy import create_engine
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
+def make_engine(url: str, **kwargs):
+    # SQLite (used for local runs and tests) refuses connections shared
+    # between threads by default, but FastAPI runs sync endpoints and
+    # dependencies on different threadpool threads.
+    if url.startswith("sqlite"):
+        kwargs.setdefault("connect_args", {"check_same_thread": False})
+    return create_engine(url, **kwargs)
+
 # Create the engine using the URL from our settings
-engine = create_engine(settings.DATABASE_URL)
+engine = make_engine(settings.DATABASE_URL)
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -12,10 +24,107 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create a Base class for our models to inherit from
 Base = declarative_base()
 
+# Optional read replica. Without READ_DATABASE_URL reads go to the primary.
+read_engine = None
+ReadSessionLocal = None
+# time until which we don't bother trying the replica again
+_replica_down_until = 0.0
+# when the replica was last seen working
+_replica_checked_at = 0.0
+
+class ReadSession(Session):
+    """
+    A session that reads from the replica while it's healthy.
+    The engine is picked when the first query runs, so a request that
+    never queries (e.g. a cache hit) never touches either database.
+    Set `info["primary"] = True` to send the session's reads to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get("primary") or not replica_available():
+            return engine
+        return read_engine
+
+def configure_read_replica(url: Optional[str]):
+    """
+    (Re)build the read replica engine. Called once at import with
+    READ_DATABASE_URL; tests call it to point at their own databases.
+    """
+    global read_engine, ReadSessionLocal, _replica_down_until, _replica_checked_at
+
+    if read_engine is not None:
+        read_engine.dispose()
+    _replica_down_until = 0.0
+    _replica_checked_at = 0.0
+    if not url:
+        read_engine = None
+        ReadSessionLocal = None
+        return
+    # pre_ping makes every checkout do a round trip, so a replica that
+    # died after warm-up fails the ping instead of a query
+    read_engine = make_engine(url, pool_pre_ping=True)
+    event.listen(read_engine, "handle_error", _on_replica_error)
+    ReadSessionLocal = sessionmaker(class_=ReadSession, autocommit=False, autoflush=False)
+
+def _mark_replica_down():
+    global _replica_down_until
+    _replica_down_until = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+
+def _on_replica_error(context):
+    # A lost or refused connection takes the replica out of rotation,
+    # so only the request that hit it fails
+    if context.is_disconnect or context.connection is None:
+        _mark_replica_down()
+
+def replica_available() -> bool:
+    """
+    Whether reads should go to the replica. Connects to it at most once
+    every READ_REPLICA_CHECK_SECONDS; in between the answer is cached.
+    """
+    global _replica_checked_at
+
+    if read_engine is None:
+        return False
+    now = time.monotonic()
+    if _replica_down_until > now:
+        return False
+    if now - _replica_checked_at < settings.READ_REPLICA_CHECK_SECONDS:
+        return True
+    try:
+        with read_engine.connect():
+            pass  # pre_ping does the round trip
+    except OperationalError:
+        _mark_replica_down()
+        return False
+    _replica_checked_at = now
+    return True
+
+configure_read_replica(settings.READ_DATABASE_URL)
+
 # Dependency to get a DB session in our API endpoints
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def open_read_session(prefer_primary: bool = False):
+    """
+    Open a session for read-only work.
+    Uses the replica when one is configured and healthy, unless the
+    caller needs to see recent writes; otherwise uses the primary.
+    """
+    if ReadSessionLocal is None:
+        return SessionLocal()
+    db = ReadSessionLocal()
+    db.info["primary"] = prefer_primary
+    return db
+
+# Dependency to get a read-only DB session (catalog reads)
+def get_read_db():
+    db = open_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
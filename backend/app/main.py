@@ -4,7 +4,10 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.database import engine
 from app import models
-from app.routers import auth, tracks, playlists # Import the new routers
+from app.core.config import settings
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.compression import CompressionMiddleware
+from app.routers import auth, tracks, playlists, artists, albums # Import the new routers
 from fastapi.middleware.cors import CORSMiddleware  # <-- 1. IMPORT THIS
 
 # This command tells SQLAlchemy to create all tables
@@ -18,6 +21,16 @@ origins = [
     "http://localhost",
 ]
 
+# Compression is the innermost middleware, so it only sees
+# real endpoint responses.
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Rate limiting is added before CORS so that 429/503 responses
+# still carry the CORS headers the browser needs to read them.
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -30,6 +43,8 @@ app.add_middleware(
 app.include_router(auth.router, tags=["Auth"])
 app.include_router(tracks.router)
 app.include_router(playlists.router)
+app.include_router(artists.router)
+app.include_router(albums.router)
 
 
 @app.get("/", tags=["Health"])
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app import crud, schemas
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.database import open_read_session
+
+router = APIRouter(
+    prefix="/albums",
+    tags=["Albums"],
+)
+
+# Same idea as the artist pages: short-lived cache of serialized pages.
+album_cache = TTLCache(ttl=settings.CATALOG_CACHE_SECONDS)
+
+@router.get("/{album_id}", response_model=schemas.AlbumWithTracks)
+def read_album(
+    album_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100)
+):
+    """
+    Get an album with a page of its tracks.
+    """
+    cache_key = (album_id, skip, limit)
+    cached = album_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Only take a session on a miss, so cache hits never touch the database
+    with open_read_session() as db:
+        db_album = crud.get_album_with_tracks(db, album_id=album_id, skip=skip, limit=limit)
+        if db_album is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Album not found"
+            )
+        album = schemas.AlbumWithTracks.model_validate(db_album)
+
+    album_cache.set(cache_key, album)
+    return album
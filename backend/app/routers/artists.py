@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app import crud, schemas
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.database import open_read_session
+
+router = APIRouter(
+    prefix="/artists",
+    tags=["Artists"],
+)
+
+# Artist pages are hot and change rarely, so we keep the
+# serialized pages around for a short while.
+artist_cache = TTLCache(ttl=settings.CATALOG_CACHE_SECONDS)
+
+@router.get("/{artist_id}", response_model=schemas.ArtistWithContent)
+def read_artist(
+    artist_id: int,
+    albums_skip: int = Query(0, ge=0),
+    albums_limit: int = Query(50, ge=1, le=100),
+    tracks_skip: int = Query(0, ge=0),
+    tracks_limit: int = Query(50, ge=1, le=100)
+):
+    """
+    Get an artist with a page of their albums and a page of their tracks.
+    Each list has its own paging parameters.
+    """
+    cache_key = (artist_id, albums_skip, albums_limit, tracks_skip, tracks_limit)
+    cached = artist_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Only take a session on a miss, so cache hits never touch the database
+    with open_read_session() as db:
+        db_artist = crud.get_artist_with_content(
+            db,
+            artist_id=artist_id,
+            albums_skip=albums_skip,
+            albums_limit=albums_limit,
+            tracks_skip=tracks_skip,
+            tracks_limit=tracks_limit,
+        )
+        if db_artist is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Artist not found"
+            )
+        artist = schemas.ArtistWithContent.model_validate(db_artist)
+
+    artist_cache.set(cache_key, artist)
+    return artist
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -8,25 +8,29 @@ from app.database import get_db
 router = APIRouter(
     prefix="/playlists",
     tags=["Playlists"],
-    dependencies=[Depends(auth.get_current_user)] # Protect ALL routes in this router
+    # Every route takes a current user, which protects it. Reads use
+    # auth.get_current_user_read so they don't need the primary.
 )
 
 @router.post("/", response_model=schemas.Playlist, status_code=status.HTTP_201_CREATED)
 def create_playlist(
     playlist: schemas.PlaylistCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """
     Create a new playlist for the current user.
     """
-    return crud.create_playlist(db=db, playlist=playlist, user_id=current_user.id)
+    db_playlist = crud.create_playlist(db=db, playlist=playlist, user_id=current_user.id)
+    auth.mark_user_wrote(response)
+    return db_playlist
 
 @router.get("/{playlist_id}", response_model=schemas.Playlist)
 def read_playlist(
     playlist_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: Session = Depends(auth.get_user_read_db),
+    current_user: models.User = Depends(auth.get_current_user_read)
 ):
     """
     Get details for a specific playlist, including its tracks.
@@ -45,8 +49,8 @@ def read_playlist(
 
 @router.get("/", response_model=List[schemas.Playlist])
 def read_user_playlists(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: Session = Depends(auth.get_user_read_db),
+    current_user: models.User = Depends(auth.get_current_user_read)
 ):
     """
     Get all playlists for the currently logged-in user.
@@ -58,6 +62,7 @@ def read_user_playlists(
 def update_playlist_name(
     playlist_id: int,
     playlist_update: schemas.PlaylistCreate, # We re-use the Create schema for the 'name' field
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
@@ -70,12 +75,15 @@ def update_playlist_name(
     if db_playlist.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to modify this playlist")
     
-    return crud.rename_playlist(db, playlist=db_playlist, new_name=playlist_update.name)
+    db_playlist = crud.rename_playlist(db, playlist=db_playlist, new_name=playlist_update.name)
+    auth.mark_user_wrote(response)
+    return db_playlist
 
 
 @router.delete("/{playlist_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_playlist(
     playlist_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
@@ -89,6 +97,7 @@ def delete_playlist(
         raise HTTPException(status_code=403, detail="Not authorized to delete this playlist")
         
     crud.delete_playlist(db, playlist=db_playlist)
+    auth.mark_user_wrote(response)
     return {"ok": True} # Body won't actually be sent due to 204 status
 
 
@@ -100,6 +109,7 @@ def delete_playlist(
 def add_track_to_playlist(
     playlist_id: int,
     track_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
@@ -116,13 +126,16 @@ def add_track_to_playlist(
     if not db_track:
         raise HTTPException(status_code=404, detail="Track not found")
 
-    return crud.add_track_to_playlist(db, playlist=db_playlist, track=db_track)
+    db_playlist = crud.add_track_to_playlist(db, playlist=db_playlist, track=db_track)
+    auth.mark_user_wrote(response)
+    return db_playlist
 
 
 @router.delete("/{playlist_id}/tracks/{track_id}", response_model=schemas.Playlist)
 def remove_track_from_playlist(
     playlist_id: int,
     track_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
@@ -139,4 +152,6 @@ def remove_track_from_playlist(
     if not db_track:
         raise HTTPException(status_code=404, detail="Track not found")
 
-    return crud.remove_track_from_playlist(db, playlist=db_playlist, track=db_track)
\ No newline at end of file
+    db_playlist = crud.remove_track_from_playlist(db, playlist=db_playlist, track=db_track)
+    auth.mark_user_wrote(response)
+    return db_playlist
\ No newline at end of file
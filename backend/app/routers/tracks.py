@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app import crud, schemas
-from app.database import get_db
+from app.database import get_read_db
 
 router = APIRouter(
     prefix="/tracks",  # All paths in this router will start with /tracks
@@ -14,7 +14,7 @@ router = APIRouter(
 def read_tracks(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve a list of all tracks in the catalog.
@@ -26,7 +26,7 @@ def read_tracks(
 @router.get("/search", response_model=List[schemas.Track])
 def search_for_tracks(
     q: str = Query(..., min_length=3, description="Search term for track title or artist name"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Search for tracks by title or artist name.
@@ -36,7 +36,7 @@ def search_for_tracks(
 
 
 @router.get("/{track_id}", response_model=schemas.Track)
-def read_track(track_id: int, db: Session = Depends(get_db)):
+def read_track(track_id: int, db: Session = Depends(get_read_db)):
     """
     Get details for a single track.
     """
@@ -117,6 +117,12 @@ class ArtistWithContent(Artist):
     class Config(Config):
         pass
 
+class AlbumWithTracks(Album):
+    tracks: List[Track] = []
+
+    class Config(Config):
+        pass
+
 class UserWithPlaylists(User):
     playlists: List[Playlist] = []
 
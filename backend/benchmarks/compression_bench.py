@@ -0,0 +1,102 @@
+"""
+CPU cost versus bytes saved for the response compressors.
+
+Run from backend/:
+    python -m benchmarks.compression_bench
+
+Payloads are serialized the same way FastAPI does it (schemas -> JSON),
+built from the seed tracks in data/tracks.json.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import schemas  # noqa: E402
+from app.core import compression  # noqa: E402
+
+DATA_FILE = Path(__file__).parent.parent / "data/tracks.json"
+
+# Levels to compare; the middleware's defaults are marked with *
+LEVELS = {
+    "gzip": [1, 4, 6, 9],
+    "br": [1, 4, 6, 11],
+    "zstd": [1, 3, 6, 12],
+}
+
+
+def make_tracks(count: int):
+    seed = json.loads(DATA_FILE.read_text())["tracks"]
+    tracks = []
+    for i in range(count):
+        item = seed[i % len(seed)]
+        artist_id = i % 7 + 1
+        album_id = i % 13 + 1
+        tracks.append({
+            "id": i + 1,
+            "title": f"{item['title']} ({i})",
+            "duration": item["duration"] + i,
+            "preview_url": item["preview_url"],
+            "artist": {"id": artist_id, "name": f"{item['artist_name']} {artist_id}"},
+            "album": {
+                "id": album_id,
+                "title": f"{item['album_name']} {album_id}",
+                "artist_id": artist_id,
+                "artist": {"id": artist_id, "name": f"{item['artist_name']} {artist_id}"},
+            },
+        })
+    return tracks
+
+
+def render(model) -> bytes:
+    # Same settings as starlette's JSONResponse.render
+    return json.dumps(
+        model, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def payloads():
+    playlist = schemas.Playlist.model_validate(
+        {"id": 1, "name": "Road trip", "user_id": 1, "tracks": make_tracks(50)}
+    )
+    page = [schemas.Track.model_validate(t) for t in make_tracks(100)]
+    return {
+        "playlist (50 tracks)": render(playlist.model_dump(mode="json")),
+        "/tracks page (100)": render([t.model_dump(mode="json") for t in page]),
+    }
+
+
+def bench(encoding: str, level: int, body: bytes, min_time: float = 0.2):
+    cls = compression.COMPRESSORS[encoding]
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        compressor = cls(level)
+        compressed = compressor.process(body) + compressor.finish()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return len(compressed), elapsed / runs
+
+
+def main():
+    print(f"available: {', '.join(compression.COMPRESSORS)}")
+    for name, body in payloads().items():
+        print(f"\n{name}: {len(body)} bytes")
+        print(f"{'coder':<10}{'bytes':>8}{'saved':>8}{'us/call':>10}{'MB/s':>8}{'KB saved/ms':>13}")
+        for encoding, cls in compression.COMPRESSORS.items():
+            for level in LEVELS[encoding]:
+                size, seconds = bench(encoding, level, body)
+                saved = len(body) - size
+                marker = "*" if level == cls.level else " "
+                print(
+                    f"{encoding + ' ' + str(level) + marker:<10}{size:>8}"
+                    f"{saved / len(body):>8.1%}{seconds * 1e6:>10.0f}"
+                    f"{len(body) / seconds / 1e6:>8.0f}{saved / 1024 / (seconds * 1e3):>13.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+import pytest
+
+# The app builds its engine at import time, so point it at a
+# throwaway SQLite file before anything imports app.database.
+# Overwrite rather than setdefault: inside the compose container
+# DATABASE_URL points at the dev Postgres. Empty values also win over
+# a local .env file.
+_tmp_dir = tempfile.mkdtemp(prefix="spotify-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/primary.db"
+os.environ["READ_DATABASE_URL"] = ""
+os.environ["RATE_LIMIT_STORE_URL"] = ""
+
+from app.core.rate_limit import InMemoryBucketStore, RateLimitMiddleware  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture
+def tmp_db_dir():
+    return _tmp_dir
+
+
+def find_rate_limiter():
+    """The app's RateLimitMiddleware, once the middleware stack is built."""
+    node = app.middleware_stack
+    while node is not None:
+        if isinstance(node, RateLimitMiddleware):
+            return node
+        node = getattr(node, "app", None)
+    return None
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """
+    The app keeps its limiter state between requests, so give every
+    test fresh buckets. The middleware stack is built on first request.
+    """
+    limiter = find_rate_limiter()
+    if limiter is not None:
+        limiter.store = InMemoryBucketStore()
+        limiter.fallback_store = InMemoryBucketStore()
+        limiter.store_down = False
+        limiter.in_flight = {name: 0 for name in limiter.route_classes}
+    yield
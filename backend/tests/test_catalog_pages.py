@@ -0,0 +1,139 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import crud, models, schemas
+from app.database import SessionLocal, engine
+from app.main import app
+from app.routers import albums, artists
+from app.routers.albums import album_cache
+from app.routers.artists import artist_cache
+
+
+@pytest.fixture
+def artist():
+    """An artist with 5 albums of 30 tracks each."""
+    with SessionLocal() as db:
+        db_artist = models.Artist(name=f"Artist {uuid.uuid4().hex}")
+        db.add(db_artist)
+        db.flush()
+        for a in range(5):
+            album = models.Album(title=f"Album {a}", artist_id=db_artist.id)
+            db.add(album)
+            db.flush()
+            for t in range(30):
+                db.add(models.Track(
+                    title=f"Track {a}-{t}",
+                    duration=200,
+                    preview_url="/assets/audio/x.mp3",
+                    artist_id=db_artist.id,
+                    album_id=album.id,
+                ))
+        db.commit()
+        artist_id = db_artist.id
+        first_album_id = db_artist.albums[0].id
+    artist_cache.clear()
+    album_cache.clear()
+    return artist_id, first_album_id
+
+
+@pytest.fixture
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.parametrize("albums_limit", [1, 5])
+def test_artist_page_takes_three_queries(artist, count_queries, albums_limit):
+    artist_id, _ = artist
+    with SessionLocal() as db:
+        # With albums_limit=1 most tracks' albums aren't on the albums page,
+        # so they must come from the join, not from lazy loads.
+        db_artist = crud.get_artist_with_content(
+            db, artist_id, albums_limit=albums_limit, tracks_limit=100
+        )
+        page = schemas.ArtistWithContent.model_validate(db_artist)
+
+    assert len(page.albums) == albums_limit
+    assert len(page.tracks) == 100
+    assert len(count_queries) == 3
+
+
+def test_album_page_takes_two_queries(artist, count_queries):
+    _, album_id = artist
+    with SessionLocal() as db:
+        db_album = crud.get_album_with_tracks(db, album_id, limit=100)
+        page = schemas.AlbumWithTracks.model_validate(db_album)
+
+    assert len(page.tracks) == 30
+    assert len(count_queries) == 2
+
+
+def test_artist_lists_page_independently(artist):
+    artist_id, _ = artist
+    client = TestClient(app)
+
+    first = client.get(f"/artists/{artist_id}").json()
+    assert len(first["albums"]) == 5
+    assert len(first["tracks"]) == 50
+
+    second = client.get(f"/artists/{artist_id}", params={"tracks_skip": 50}).json()
+    assert second["albums"] == first["albums"]
+    assert second["tracks"][0]["title"] == "Track 1-20"
+
+    albums = client.get(f"/artists/{artist_id}", params={"albums_skip": 3, "albums_limit": 1}).json()
+    assert [a["title"] for a in albums["albums"]] == ["Album 3"]
+    assert albums["tracks"] == first["tracks"]
+
+
+def test_album_page(artist):
+    _, album_id = artist
+    client = TestClient(app)
+    page = client.get(f"/albums/{album_id}", params={"skip": 25}).json()
+    assert page["title"] == "Album 0"
+    assert [t["title"] for t in page["tracks"]] == [f"Track 0-{t}" for t in range(25, 30)]
+
+
+def test_cache_hits_open_no_session(artist, monkeypatch):
+    artist_id, album_id = artist
+    client = TestClient(app)
+    first_artist = client.get(f"/artists/{artist_id}").json()
+    first_album = client.get(f"/albums/{album_id}").json()
+
+    def no_session():
+        raise AssertionError("cache hit opened a session")
+
+    monkeypatch.setattr(artists, "open_read_session", no_session)
+    monkeypatch.setattr(albums, "open_read_session", no_session)
+    assert client.get(f"/artists/{artist_id}").json() == first_artist
+    assert client.get(f"/albums/{album_id}").json() == first_album
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/artists/{artist}", {"tracks_limit": -1}),
+    ("/artists/{artist}", {"tracks_limit": 0}),
+    ("/artists/{artist}", {"albums_limit": 101}),
+    ("/artists/{artist}", {"tracks_skip": -1}),
+    ("/albums/{album}", {"limit": -1}),
+    ("/albums/{album}", {"limit": 101}),
+    ("/albums/{album}", {"skip": -5}),
+])
+def test_invalid_paging_is_rejected(artist, path, params):
+    artist_id, album_id = artist
+    client = TestClient(app)
+    response = client.get(path.format(artist=artist_id, album=album_id), params=params)
+    assert response.status_code == 422
+
+
+def test_missing_artist_and_album_return_404():
+    client = TestClient(app)
+    assert client.get("/artists/999999").status_code == 404
+    assert client.get("/albums/999999").status_code == 404
@@ -0,0 +1,155 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, choose_encoding
+
+BIG = [{"id": i, "title": f"Track {i}", "artist": {"id": 1, "name": "Queen"}} for i in range(200)]
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("gzip;q=0.5", "gzip"),
+    ("gzip; q=1.0", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=0.0", None),
+    ("gzip;q=abc", None),
+    ("identity", None),
+    ("", None),
+    ("*", "gzip"),
+    ("deflate, *;q=0", None),
+    ("gzip;q=1, br;q=0.1", "gzip"),
+    ("zstd;q=0.2, br;q=0.3, gzip;q=0.9", "gzip"),
+    ("gzip;q=0.5, *;q=0.1", "gzip"),
+])
+def test_choose_encoding_q_values(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_refused_coding_is_not_picked_through_star():
+    picked = choose_encoding("gzip;q=0, *")
+    assert picked != "gzip"
+    assert picked in (None, "zstd", "br")
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+def test_equal_q_values_follow_server_preference():
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip;q=0.5, br;q=0.5") == "br"
+    # A coding only accepted through "*" doesn't beat a named one
+    assert choose_encoding("gzip, *") == "gzip"
+
+
+def test_all_refused_means_no_compression():
+    assert choose_encoding("gzip;q=0, br;q=0, zstd;q=0, *") is None
+
+
+def make_client(**kwargs):
+    inner = FastAPI()
+
+    @inner.get("/tracks/big")
+    def big():
+        return BIG
+
+    @inner.get("/playlists/big")
+    def private_big():
+        return BIG
+
+    @inner.get("/small")
+    def small():
+        return {"ok": True}
+
+    @inner.get("/stream")
+    def stream():
+        def chunks():
+            for item in BIG:
+                yield json.dumps(item).encode() + b"\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return TestClient(CompressionMiddleware(inner, **kwargs))
+
+
+def get_gzip(client, path):
+    # Decode by hand, so we test exactly what went over the wire
+    with client.stream("GET", path, headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    return response, raw
+
+
+def test_large_json_is_compressed():
+    response, raw = get_gzip(make_client(), "/tracks/big")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) == len(raw)
+    assert json.loads(gzip.decompress(raw)) == BIG
+
+
+def test_small_body_is_sent_as_is():
+    response, raw = get_gzip(make_client(), "/small")
+    assert "content-encoding" not in response.headers
+    assert json.loads(raw) == {"ok": True}
+
+
+def test_streamed_response_is_compressed_incrementally():
+    response, raw = get_gzip(make_client(), "/stream")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = gzip.decompress(raw).splitlines()
+    assert [json.loads(line) for line in lines] == BIG
+
+
+def test_large_body_compressed_off_the_event_loop():
+    response, raw = get_gzip(make_client(offload_min_size=0), "/tracks/big")
+    assert json.loads(gzip.decompress(raw)) == BIG
+
+
+@pytest.fixture
+def count_compress(monkeypatch):
+    calls = []
+    original = compression.compress
+
+    def counting(encoding, body):
+        calls.append(encoding)
+        return original(encoding, body)
+
+    monkeypatch.setattr(compression, "compress", counting)
+    return calls
+
+
+def test_catalog_responses_reuse_compressed_body(count_compress):
+    client = make_client()
+    first = get_gzip(client, "/tracks/big")[1]
+    second = get_gzip(client, "/tracks/big")[1]
+    assert first == second
+    assert count_compress == ["gzip"]
+
+
+def test_user_specific_responses_are_not_cached(count_compress):
+    client = make_client()
+    get_gzip(client, "/playlists/big")
+    get_gzip(client, "/playlists/big")
+    assert count_compress == ["gzip", "gzip"]
+
+
+DECODERS = {"gzip": gzip.decompress}
+if compression.brotli is not None:
+    DECODERS["br"] = compression.brotli.decompress
+if compression.zstandard is not None:
+    DECODERS["zstd"] = lambda data: compression.zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+@pytest.mark.parametrize("encoding", list(DECODERS))
+def test_streaming_compressors_round_trip(encoding):
+    body = json.dumps(BIG).encode()
+    compressor = compression.COMPRESSORS[encoding]()
+    out = b""
+    for i in range(0, len(body), 1000):
+        out += compressor.process(body[i:i + 1000]) + compressor.flush()
+    out += compressor.finish()
+    assert DECODERS[encoding](out) == body
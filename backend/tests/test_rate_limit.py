@@ -0,0 +1,257 @@
+import asyncio
+import time
+
+import fakeredis
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import auth, crud, schemas
+from app.core.rate_limit import InMemoryBucketStore, RateLimitMiddleware, RedisBucketStore, StoreUnavailable
+from app.database import SessionLocal
+from app.main import app
+from tests.conftest import find_rate_limiter
+
+LIMITS = {
+    "test": {
+        "rate": 100.0, "burst": 100,
+        "client_rate": 1.0, "client_burst": 2,
+        "concurrency": 1,
+    },
+}
+ROUTES = {("GET", "/limited"): "test"}
+
+
+def make_app(store=None, hold: asyncio.Event = None):
+    """A bare ASGI app behind the limiter, optionally blocking until `hold` is set."""
+
+    async def inner(scope, receive, send):
+        if hold is not None:
+            await hold.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return RateLimitMiddleware(inner, store=store if store is not None else InMemoryBucketStore(), route_classes=LIMITS, routes=ROUTES)
+
+
+def client_for(asgi_app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url="http://test")
+
+
+def p99(samples):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def test_empty_bucket_returns_429_with_retry_after():
+    async def run():
+        async with client_for(make_app()) as client:
+            statuses = [(await client.get("/limited")) for _ in range(3)]
+            return statuses
+
+    first, second, third = asyncio.run(run())
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert third.status_code == 429
+    assert int(third.headers["Retry-After"]) >= 1
+
+
+def test_unlisted_routes_are_not_limited():
+    async def run():
+        async with client_for(make_app()) as client:
+            return [(await client.get("/free")).status_code for _ in range(10)]
+
+    assert asyncio.run(run()) == [200] * 10
+
+
+def test_concurrency_limit_returns_503():
+    async def run():
+        hold = asyncio.Event()
+        async with client_for(make_app(hold=hold)) as client:
+            first = asyncio.create_task(client.get("/limited"))
+            await asyncio.sleep(0.05)
+            second = await client.get("/limited")
+            hold.set()
+            return await first, second
+
+    first, second = asyncio.run(run())
+    assert first.status_code == 200
+    assert second.status_code == 503
+    assert second.headers["Retry-After"] == "1"
+
+
+class SlowStore(InMemoryBucketStore):
+    """Behaves like a remote store: every take() waits on a round trip."""
+
+    async def take(self, key, rate, burst):
+        await asyncio.sleep(0.01)
+        return await super().take(key, rate, burst)
+
+
+def test_concurrency_limit_holds_when_store_yields():
+    async def run():
+        hold = asyncio.Event()
+        middleware = make_app(store=SlowStore(), hold=hold)
+        async with client_for(middleware) as client:
+            tasks = [asyncio.create_task(client.get("/limited")) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            in_flight = middleware.in_flight["test"]
+            hold.set()
+            responses = await asyncio.gather(*tasks)
+            return in_flight, responses, middleware.in_flight["test"]
+
+    in_flight, responses, after = asyncio.run(run())
+    assert in_flight == 1
+    assert [r.status_code for r in responses].count(503) == 4
+    # Slots are released again, including for rejected requests
+    assert after == 0
+
+
+def test_in_memory_store_evicts_idle_and_caps_keys():
+    async def run():
+        store = InMemoryBucketStore(max_keys=50)
+        for i in range(200):
+            await store.take(f"client:{i}", 1.0, 5)
+        capped = len(store)
+
+        # A very fast refill makes buckets idle-full almost immediately
+        idle = InMemoryBucketStore()
+        for i in range(20):
+            await idle.take(f"client:{i}", 1000.0, 1)
+        await asyncio.sleep(0.01)
+        await idle.take("client:last", 1000.0, 1)
+        return capped, len(idle)
+
+    capped, idle = asyncio.run(run())
+    assert capped == 50
+    assert idle == 1
+
+
+def test_redis_store_against_stand_in():
+    async def run():
+        store = RedisBucketStore(client=fakeredis.FakeAsyncRedis())
+        waits = [await store.take("client:auth:1.2.3.4", 1.0, 3) for _ in range(4)]
+        other = await store.take("client:auth:5.6.7.8", 1.0, 3)
+        return waits, other
+
+    waits, other = asyncio.run(run())
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] > 0
+    assert other == 0.0
+
+
+def test_middleware_with_redis_store_returns_429():
+    async def run():
+        store = RedisBucketStore(client=fakeredis.FakeAsyncRedis())
+        async with client_for(make_app(store=store)) as client:
+            return [(await client.get("/limited")).status_code for _ in range(3)]
+
+    assert asyncio.run(run()) == [200, 200, 429]
+
+
+class BrokenStore:
+    """A shared store that is down."""
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    async def take(self, key, rate, burst):
+        self.calls += 1
+        raise self.error
+
+
+@pytest.mark.parametrize("error", [
+    StoreUnavailable("down"),
+    ConnectionError("refused"),
+    TimeoutError("timed out"),
+])
+def test_store_errors_fall_back_to_local_limits(error, caplog):
+    store = BrokenStore(error)
+
+    async def run():
+        async with client_for(make_app(store=store)) as client:
+            return [(await client.get("/limited")).status_code for _ in range(3)]
+
+    with caplog.at_level("WARNING", logger="app.core.rate_limit"):
+        statuses = asyncio.run(run())
+
+    # Still limited, by the per-process buckets
+    assert statuses == [200, 200, 429]
+    # The store was still tried every time: client + route bucket for the
+    # two admitted requests, the client bucket for the rejected one
+    assert store.calls == 5
+    # One warning when the store goes down, not one per request
+    assert len([r for r in caplog.records if "unavailable" in r.message]) == 1
+
+
+def test_unreachable_redis_raises_store_unavailable():
+    store = RedisBucketStore("redis://127.0.0.1:1/0")
+    with pytest.raises(StoreUnavailable):
+        asyncio.run(store.take("client:auth:1.2.3.4", 1.0, 3))
+
+
+def test_login_survives_unreachable_redis():
+    client = TestClient(app)
+    client.get("/")  # build the middleware stack
+    find_rate_limiter().store = RedisBucketStore("redis://127.0.0.1:1/0")
+
+    response = client.post("/token", data={"username": "nobody@example.com", "password": "x"})
+    assert response.status_code == 401
+
+
+def test_cheap_route_p99_stays_flat_during_auth_storm():
+    email = "storm@example.com"
+    with SessionLocal() as db:
+        if crud.get_user_by_email(db, email) is None:
+            crud.create_user(
+                db,
+                schemas.UserCreate(email=email, password="x"),
+                hashed_password=auth.get_password_hash("correct-password"),
+            )
+
+    async def time_health_checks(client, n=200):
+        samples = []
+        for _ in range(n):
+            start = time.perf_counter()
+            response = await client.get("/")
+            samples.append(time.perf_counter() - start)
+            assert response.status_code == 200
+            await asyncio.sleep(0.005)
+        return samples
+
+    async def storm(client, done, requests, rate=200):
+        # Open loop: logins keep arriving at `rate` per second no matter
+        # how fast they are answered, far above what the auth limits admit.
+        # Wrong password, so every admitted request pays for a bcrypt check.
+        while not done.is_set():
+            requests.append(asyncio.create_task(
+                client.post("/token", data={"username": email, "password": "wrong"})
+            ))
+            await asyncio.sleep(1 / rate)
+
+    async def run():
+        async with client_for(app) as client:
+            for _ in range(5):
+                await client.get("/")  # warm up
+            baseline = await time_health_checks(client)
+
+            done = asyncio.Event()
+            requests = []
+            storm_task = asyncio.create_task(storm(client, done, requests))
+            await asyncio.sleep(0.5)  # let the storm get going
+            during = await time_health_checks(client)
+            done.set()
+            await storm_task
+            return baseline, during, await asyncio.gather(*requests)
+
+    baseline, during, storm_responses = asyncio.run(run())
+    statuses = [r.status_code for r in storm_responses]
+
+    # Almost all of the storm was shed straight away...
+    assert statuses.count(429) + statuses.count(503) >= 0.9 * len(statuses)
+    for response in storm_responses:
+        if response.status_code in (429, 503):
+            assert "Retry-After" in response.headers
+    # ...so the cheap route doesn't feel it
+    assert p99(during) <= max(3 * p99(baseline), p99(baseline) + 0.05)
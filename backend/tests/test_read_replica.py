@@ -0,0 +1,131 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import auth, crud, database, models
+from app.main import app
+
+
+@pytest.fixture
+def replica(tmp_db_dir):
+    """A second, empty SQLite file standing in for the replica (with no replication)."""
+    url = f"sqlite:///{tmp_db_dir}/replica-{uuid.uuid4().hex}.db"
+    database.configure_read_replica(url)
+    models.Base.metadata.create_all(bind=database.read_engine)
+    yield database.read_engine
+    database.configure_read_replica(None)
+
+
+def count_checkouts(engine):
+    checkouts = []
+    event.listen(engine, "checkout", lambda *args: checkouts.append(1))
+    return checkouts
+
+
+def login(client):
+    email = f"{uuid.uuid4().hex}@example.com"
+    assert client.post("/register", json={"email": email, "password": "secret"}).status_code == 201
+    token = client.post("/token", data={"username": email, "password": "secret"}).json()["access_token"]
+    return email, {"Authorization": f"Bearer {token}"}
+
+
+def replicate_user(replica_engine, email):
+    """Copy a user to the replica, as replication eventually would."""
+    with database.SessionLocal() as primary:
+        user = crud.get_user_by_email(primary, email)
+        row = {"id": user.id, "email": user.email, "hashed_password": user.hashed_password}
+    with replica_engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), row)
+
+
+def test_reads_go_to_replica(replica):
+    client = TestClient(app)
+    email, headers = login(client)
+    replicate_user(replica, email)
+    assert client.post("/playlists/", json={"name": "Mix"}, headers=headers).status_code == 201
+
+    # Without the sticky cookie the read hits the replica, which
+    # doesn't have the playlist yet
+    client.cookies.clear()
+    assert client.get("/playlists/", headers=headers).json() == []
+
+
+def test_playlist_reads_use_no_primary_connection(replica):
+    client = TestClient(app)
+    email, headers = login(client)
+    replicate_user(replica, email)
+    client.cookies.clear()
+
+    primary_checkouts = count_checkouts(database.engine)
+    assert client.get("/playlists/", headers=headers).status_code == 200
+    assert primary_checkouts == []
+
+
+def test_just_registered_user_falls_back_to_primary(replica):
+    client = TestClient(app)
+    _, headers = login(client)  # not on the replica yet
+    client.post("/playlists/", json={"name": "Mix"}, headers=headers)
+    client.cookies.clear()
+
+    # The user lookup misses on the replica, so the whole read moves to the primary
+    playlists = client.get("/playlists/", headers=headers).json()
+    assert [p["name"] for p in playlists] == ["Mix"]
+
+
+def test_reads_after_write_stick_to_primary(replica):
+    client = TestClient(app)
+    email, headers = login(client)
+    replicate_user(replica, email)
+    response = client.post("/playlists/", json={"name": "Mix"}, headers=headers)
+    assert auth.READ_STICKY_COOKIE in response.cookies
+
+    playlists = client.get("/playlists/", headers=headers).json()
+    assert [p["name"] for p in playlists] == ["Mix"]
+
+
+def test_tampered_sticky_cookie_is_ignored(replica):
+    client = TestClient(app)
+    email, headers = login(client)
+    replicate_user(replica, email)
+    client.post("/playlists/", json={"name": "Mix"}, headers=headers)
+
+    until, signature = client.cookies[auth.READ_STICKY_COOKIE].split(":")
+    client.cookies.clear()
+    client.cookies.set(auth.READ_STICKY_COOKIE, f"{int(until) + 3600}:{signature}")
+    assert client.get("/playlists/", headers=headers).json() == []
+
+
+def test_unused_read_session_takes_no_connection(replica):
+    database.replica_available()  # warm the health check
+    checkouts = count_checkouts(replica)
+    primary_checkouts = count_checkouts(database.engine)
+
+    db = database.open_read_session()
+    db.close()
+    assert checkouts == []
+    assert primary_checkouts == []
+
+
+def test_replica_health_check_is_cached(replica):
+    checkouts = count_checkouts(replica)
+    assert database.replica_available()
+    assert database.replica_available()
+    assert len(checkouts) == 1
+
+
+def test_falls_back_to_primary_when_replica_unreachable(tmp_db_dir):
+    database.configure_read_replica(f"sqlite:///{tmp_db_dir}/missing-dir/replica.db")
+    try:
+        client = TestClient(app)
+        _, headers = login(client)
+        client.post("/playlists/", json={"name": "Mix"}, headers=headers)
+        client.cookies.clear()
+
+        playlists = client.get("/playlists/", headers=headers).json()
+        assert [p["name"] for p in playlists] == ["Mix"]
+        assert client.get("/tracks/").status_code == 200
+        assert not database.replica_available()
+    finally:
+        database.configure_read_replica(None)
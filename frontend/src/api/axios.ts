@@ -4,6 +4,9 @@ const api = axios.create({
   // We use localhost:8000 because our React app (in its container)
   // is accessing the backend via the port mapped to the *host* machine.
   baseURL: 'http://localhost:8000',
+  // Send cookies, so the backend's read-your-writes cookie comes back
+  // and our reads right after a playlist change hit the primary DB.
+  withCredentials: true,
 });
 
 // We'll add an interceptor here later to automatically add